@@ -13,6 +13,20 @@ RAG_DIR="$SCRIPT_DIR"
 
 echo -e "${YELLOW}🔄 Reindexing RAG system...${NC}"
 
+# If a shared server is running, let it do the indexing so only one process
+# ever writes to the Chroma DB and its in-memory state stays current
+if [ -n "$RAG_SERVER_URL" ] && curl -sf "$RAG_SERVER_URL/health" > /dev/null 2>&1; then
+    echo -e "${YELLOW}Indexing through RAG server at $RAG_SERVER_URL...${NC}"
+    if curl -sf -X POST -H "Content-Type: application/json" -d '{}' "$RAG_SERVER_URL/ingest"; then
+        echo
+        echo -e "${GREEN}✅ RAG reindexing completed successfully${NC}"
+        exit 0
+    else
+        echo -e "${RED}❌ RAG reindexing through server failed${NC}"
+        exit 1
+    fi
+fi
+
 # Check if virtual environment exists
 if [ ! -d "$RAG_DIR/.venv" ]; then
     echo -e "${RED}❌ Virtual environment not found${NC}"
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 """
 Entry point for the BallroomCompManager RAG MCP Server.
-Run this script to start the MCP server using stdio transport.
+Run this script to start the MCP server using stdio transport (default), or
+with --transport sse to run one shared HTTP/SSE server for many local clients.
 """
 
+import argparse
 import asyncio
 import os
 import sys
@@ -12,7 +14,31 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 # Add the project root to the path so imports work correctly
 sys.path.insert(0, project_root)
 
-from rag.tools.mcp_server.server import main
+from rag.tools.rag_config import SERVER_HOST, SERVER_PORT
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="BallroomCompManager RAG MCP server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "sse"],
+        default="stdio",
+        help="stdio: one process per client (default); sse: shared HTTP server",
+    )
+    parser.add_argument("--host", default=SERVER_HOST, help="Host for --transport sse")
+    parser.add_argument(
+        "--port", type=int, default=SERVER_PORT, help="Port for --transport sse"
+    )
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.transport == "sse":
+        from rag.tools.mcp_server.http_server import main as sse_main
+
+        asyncio.run(sse_main(host=args.host, port=args.port))
+    else:
+        from rag.tools.mcp_server.server import main
+
+        asyncio.run(main())
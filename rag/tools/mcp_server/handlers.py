@@ -6,7 +6,24 @@ from typing import Any, Dict
 # Adjust the import path if rag_service.py lives elsewhere.
 # If rag_service is at rag/tools/rag_service.py this import should work
 # because this handlers module is under rag/tools/mcp_server/.
-from ..rag_service import collection, index_project, query_rag  # type: ignore
+from ..rag_service import (  # type: ignore
+    build_prompt,
+    clear_index,
+    collection,
+    index_project,
+    query_chunks,
+)
+
+
+def _also_in(meta) -> list:
+    """Other files whose duplicate chunks were folded into this chunk."""
+    source = meta.get("source")
+    sources = []
+    for alias in (meta.get("aliases") or "").split(", "):
+        alias_source = alias.rsplit("#", 1)[0]
+        if alias and alias_source != source and alias_source not in sources:
+            sources.append(alias_source)
+    return sources
 
 
 def handle_ingest(force_rebuild: bool = False) -> Dict[str, Any]:
@@ -17,37 +34,60 @@ def handle_ingest(force_rebuild: bool = False) -> Dict[str, Any]:
     try:
         if force_rebuild:
             try:
-                # delete all docs (collection.delete accepts ids or where clauses)
-                # We'll call delete with no args if supported; otherwise delete by scanning
-                existing = collection.get()
-                ids = existing.get("ids", [])
-                if ids:
-                    collection.delete(ids=ids)
+                clear_index()
             except Exception as e:
                 return {"ok": False, "error": f"Failed to clear collection: {str(e)}"}
 
         # Run the ingestion routine from rag_service
-        index_project()
-        # Return simple status
-        return {"ok": True, "message": "Indexing completed successfully"}
+        summary = index_project()
+        message = (
+            f"Indexing completed successfully: {summary['chunks_added']} chunks "
+            f"added, {summary['duplicates_folded']} duplicates folded, "
+            f"{len(summary['skipped'])} files skipped"
+        )
+        for skip in summary["skipped"]:
+            message += f"\n  {skip['source']}: {skip['reason']}"
+        return {"ok": True, "message": message, "summary": summary}
     except Exception as e:
         return {"ok": False, "error": f"Indexing failed: {str(e)}"}
 
 
-def handle_query(query: str, top_k: int = 5, type_filter=None) -> Dict[str, Any]:
+def handle_query(
+    query: str, top_k: int = 5, type_filter=None, expand: int = 0
+) -> Dict[str, Any]:
     """
-    Run a RAG query and return the results.
+    Run a RAG query and return the results. With expand > 0, up to that many
+    related chunks from import-graph neighbours are appended.
     """
-    docs = query_rag(query, top_k=top_k, type_filter=type_filter)
+    chunks = query_chunks(query, top_k=top_k, type_filter=type_filter, expand=expand)
     return {
         "ok": True,
         "query": query,
         "top_k": top_k,
         "type_filter": type_filter,
-        "chunks": docs,
+        "expand": expand,
+        "chunks": [
+            {
+                "text": doc,
+                "source": (meta or {}).get("source", "unknown"),
+                "also_in": _also_in(meta or {}),
+            }
+            for doc, meta in chunks
+        ],
     }
 
 
+def handle_prompt(
+    query: str, top_k: int = 5, type_filter=None, expand: int = 0
+) -> Dict[str, Any]:
+    """
+    Build the LLM prompt (retrieved context + request) for thin clients
+    such as rag_query_helper.py.
+    """
+    prompt = build_prompt(query, top_k=top_k, type_filter=type_filter, expand=expand)
+    return {"ok": True, "query": query, "prompt": prompt}
+
+
 def handle_list() -> Dict[str, Any]:
     """
     Return a list of document ids and metadata from the collection.
@@ -60,7 +100,8 @@ def handle_list() -> Dict[str, Any]:
         # Return small summary
         summary = []
         for idx, meta in zip(ids, metadatas):
-            summary.append({"id": idx, "meta": meta})
+            meta = meta or {}
+            summary.append({"id": idx, "meta": meta, "also_in": _also_in(meta)})
         return {"ok": True, "count": len(ids), "documents": summary}
     except Exception as e:
         return {"ok": False, "error": str(e)}
@@ -0,0 +1,182 @@
+# rag/tools/mcp_server/http_server.py
+"""
+HTTP/SSE transport for the RAG MCP server.
+
+One long-running process keeps the embedding model and Chroma client warm
+and serves every local editor window / agent:
+
+- GET  /sse        MCP session stream (SSE transport)
+- POST /messages/  MCP client -> server messages
+- POST /prompt     JSON endpoint used by rag_query_helper.py
+- POST /ingest     Incremental re-index, used by reindex.sh
+- GET  /health     Liveness and load information
+"""
+import logging
+
+import uvicorn
+from mcp.server.sse import SseServerTransport
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+
+from ..rag_config import (
+    SERVER_ALLOWED_HOSTS,
+    SERVER_HOST,
+    SERVER_MAX_CONNECTIONS,
+    SERVER_PORT,
+)
+from .handlers import handle_ingest, handle_prompt
+from .request_queue import QueueFullError
+from .server import app, request_queue
+
+logger = logging.getLogger(__name__)
+
+sse = SseServerTransport("/messages/")
+
+
+def _host_name(host: str) -> str:
+    """Strip the port from a Host header value."""
+    if host.startswith("["):
+        return host[: host.find("]") + 1]
+    return host.split(":", 1)[0]
+
+
+class LocalOnlyMiddleware:
+    """
+    Reject requests that did not come from a local, non-browser client:
+    any request carrying an Origin header (cross-site fetches) and any Host
+    outside SERVER_ALLOWED_HOSTS (DNS rebinding).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = {
+                k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]
+            }
+            host = _host_name(headers.get("host", "")).lower()
+            error = None
+            if "origin" in headers:
+                error = "Cross-origin requests are not allowed"
+            elif host not in SERVER_ALLOWED_HOSTS:
+                error = "Host not allowed"
+            if error:
+                logger.warning(f"Rejecting {scope['path']}: {error}")
+                response = JSONResponse({"ok": False, "error": error}, 403)
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+# Number of open SSE sessions; only touched from the event loop thread
+_active_connections = 0
+
+
+async def handle_sse(request: Request) -> Response:
+    global _active_connections
+    if _active_connections >= SERVER_MAX_CONNECTIONS:
+        logger.warning(
+            f"Rejecting SSE client: {_active_connections} connections already open"
+        )
+        return Response("Too many connections", status_code=503)
+
+    _active_connections += 1
+    logger.info(f"SSE client connected ({_active_connections} active)")
+    try:
+        async with sse.connect_sse(
+            request.scope, request.receive, request._send
+        ) as (read_stream, write_stream):
+            await app.run(
+                read_stream, write_stream, app.create_initialization_options()
+            )
+    finally:
+        _active_connections -= 1
+        logger.info(f"SSE client disconnected ({_active_connections} active)")
+    return Response()
+
+
+async def _json_object(request: Request) -> dict:
+    # Browsers can send text/plain without a preflight; only accept real JSON
+    content_type = request.headers.get("content-type", "")
+    if content_type.split(";", 1)[0].strip().lower() != "application/json":
+        raise ValueError("Content-Type must be application/json")
+    body = await request.json()
+    if not isinstance(body, dict):
+        raise ValueError("JSON body must be an object")
+    return body
+
+
+async def _run_queued(fn, *args, **kwargs) -> JSONResponse:
+    try:
+        result = await request_queue.run(fn, *args, **kwargs)
+    except QueueFullError as e:
+        return JSONResponse({"ok": False, "error": str(e)}, 503)
+    except Exception as e:
+        logger.error(f"Error in {fn.__name__}: {e}", exc_info=True)
+        return JSONResponse({"ok": False, "error": str(e)}, 500)
+    return JSONResponse(result, 200 if result.get("ok") else 500)
+
+
+async def handle_prompt_request(request: Request) -> JSONResponse:
+    try:
+        body = await _json_object(request)
+        query = body.get("query")
+        if not query or not isinstance(query, str):
+            raise ValueError("'query' parameter is required")
+        top_k = int(body.get("top_k", 5))
+        expand = int(body.get("expand", 0))
+        type_filter = body.get("type_filter")
+        if type_filter is not None and not isinstance(type_filter, str):
+            raise ValueError("'type_filter' must be a string")
+    except (ValueError, TypeError) as e:
+        return JSONResponse({"ok": False, "error": f"Invalid request: {e}"}, 400)
+
+    return await _run_queued(
+        handle_prompt, query, top_k=top_k, type_filter=type_filter, expand=expand
+    )
+
+
+async def handle_ingest_request(request: Request) -> JSONResponse:
+    try:
+        body = await _json_object(request)
+        force_rebuild = body.get("force_rebuild", False)
+        if not isinstance(force_rebuild, bool):
+            raise ValueError("'force_rebuild' must be a boolean")
+    except ValueError as e:
+        return JSONResponse({"ok": False, "error": f"Invalid request: {e}"}, 400)
+
+    # Queued like tool calls, so indexing never overlaps queries
+    return await _run_queued(handle_ingest, force_rebuild=force_rebuild)
+
+
+async def handle_health(request: Request) -> JSONResponse:
+    return JSONResponse(
+        {
+            "ok": True,
+            "connections": _active_connections,
+            "max_connections": SERVER_MAX_CONNECTIONS,
+            "requests_in_flight": request_queue.in_flight,
+        }
+    )
+
+
+starlette_app = Starlette(
+    routes=[
+        Route("/sse", endpoint=handle_sse, methods=["GET"]),
+        Mount("/messages/", app=sse.handle_post_message),
+        Route("/prompt", endpoint=handle_prompt_request, methods=["POST"]),
+        Route("/ingest", endpoint=handle_ingest_request, methods=["POST"]),
+        Route("/health", endpoint=handle_health, methods=["GET"]),
+    ],
+    middleware=[Middleware(LocalOnlyMiddleware)],
+)
+
+
+async def main(host: str = SERVER_HOST, port: int = SERVER_PORT):
+    """Run the MCP server using HTTP/SSE transport."""
+    config = uvicorn.Config(starlette_app, host=host, port=port, log_level="info")
+    await uvicorn.Server(config).serve()
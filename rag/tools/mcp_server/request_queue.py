@@ -0,0 +1,43 @@
+# rag/tools/mcp_server/request_queue.py
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class QueueFullError(RuntimeError):
+    """Raised when too many requests are already waiting for a worker."""
+
+
+class RequestQueue:
+    """
+    Runs blocking RAG handlers on a bounded worker pool so the event loop
+    stays responsive while the model and Chroma DB are busy. Requests beyond
+    max_workers wait in line; once max_queued are waiting, new ones are
+    rejected with QueueFullError instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queued: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="rag-worker"
+        )
+        self._max_in_flight = max_workers + max_queued
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self._in_flight >= self._max_in_flight:
+            raise QueueFullError(
+                f"Server busy: {self._in_flight} requests already queued"
+            )
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self._in_flight -= 1
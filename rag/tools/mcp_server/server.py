@@ -8,8 +8,11 @@ from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, Tool
 
+from ..rag_config import SERVER_MAX_QUEUED_REQUESTS, SERVER_MAX_WORKERS
+
 # Import handlers
 from .handlers import handle_ingest, handle_list, handle_query
+from .request_queue import RequestQueue
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +21,9 @@ logger = logging.getLogger(__name__)
 # Create MCP server
 app = Server("ballroom-rag-server")
 
+# Blocking handlers run here so one slow call never stalls other clients
+request_queue = RequestQueue(SERVER_MAX_WORKERS, SERVER_MAX_QUEUED_REQUESTS)
+
 
 @app.list_tools()
 async def list_tools() -> list[Tool]:
@@ -50,6 +56,11 @@ async def list_tools() -> list[Tool]:
                             "architecture",
                         ],
                     },
+                    "expand": {
+                        "type": "integer",
+                        "description": "Number of related chunks to add from modules the results import or are imported by, e.g. the DAL function, mapper and shared schema behind a tRPC procedure (default: 0)",
+                        "default": 0,
+                    },
                 },
                 "required": ["query"],
             },
@@ -94,22 +105,34 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
             top_k = int(arguments.get("top_k", 5))
             type_filter = arguments.get("type_filter")
+            expand = int(arguments.get("expand", 0))
 
-            result = handle_query(query, top_k=top_k, type_filter=type_filter)
+            result = await request_queue.run(
+                handle_query,
+                query,
+                top_k=top_k,
+                type_filter=type_filter,
+                expand=expand,
+            )
 
             # Format the response
             if result.get("ok") and result.get("chunks"):
                 chunks = result["chunks"]
                 response = f"Found {len(chunks)} relevant chunks:\n\n"
                 for i, chunk in enumerate(chunks, 1):
-                    response += f"--- Chunk {i} ---\n{chunk}\n\n"
+                    header = f"Chunk {i}: {chunk['source']}"
+                    if chunk["also_in"]:
+                        header += f" (also in: {', '.join(chunk['also_in'])})"
+                    response += f"--- {header} ---\n{chunk['text']}\n\n"
                 return [TextContent(type="text", text=response)]
             else:
                 return [TextContent(type="text", text="No relevant chunks found.")]
 
         elif name == "rag_ingest":
             force_rebuild = arguments.get("force_rebuild", False)
-            result = handle_ingest(force_rebuild=force_rebuild)
+            result = await request_queue.run(
+                handle_ingest, force_rebuild=force_rebuild
+            )
 
             if result.get("ok"):
                 return [
@@ -126,24 +149,31 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 ]
 
         elif name == "rag_list":
-            result = handle_list()
+            result = await request_queue.run(handle_list)
 
             if result.get("ok"):
                 count = result.get("count", 0)
                 docs = result.get("documents", [])
                 response = f"Total indexed documents: {count}\n\n"
 
-                # Group by source file
+                # Group by source file; duplicates count where they are stored
                 by_source = {}
+                folded_into = {}
                 for doc in docs:
                     source = doc.get("meta", {}).get("source", "unknown")
                     if source not in by_source:
                         by_source[source] = 0
                     by_source[source] += 1
+                    for alias_source in doc.get("also_in", []):
+                        folded_into.setdefault(alias_source, set()).add(source)
 
                 response += "Documents by source:\n"
-                for source, chunk_count in sorted(by_source.items()):
-                    response += f"  {source}: {chunk_count} chunks\n"
+                for source in sorted(set(by_source) | set(folded_into)):
+                    response += f"  {source}: {by_source.get(source, 0)} chunks"
+                    if source in folded_into:
+                        stored_in = ", ".join(sorted(folded_into[source]))
+                        response += f" (duplicates stored in: {stored_in})"
+                    response += "\n"
 
                 return [TextContent(type="text", text=response)]
             else:
@@ -32,3 +32,59 @@ DIR_TYPE_MAP = {
     "client/src": "frontend",
     "rag/project-structure": "architecture",
 }
+
+# Near-duplicate chunk detection (MinHash over token shingles)
+DEDUP_ENABLED = True
+DEDUP_SHINGLE_SIZE = 5
+DEDUP_NUM_PERM = 64
+# LSH bands; DEDUP_NUM_PERM must be divisible by this
+DEDUP_BANDS = 16
+# Minimum estimated Jaccard similarity to treat a chunk as a duplicate
+DEDUP_THRESHOLD = 0.85
+
+# Shared HTTP/SSE server (run_mcp_server.py --transport sse)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+# Concurrent SSE client sessions; further clients get HTTP 503
+SERVER_MAX_CONNECTIONS = 16
+# Worker threads executing tool calls. Keep at 1 so indexing never overlaps
+# queries against the same Chroma DB.
+SERVER_MAX_WORKERS = 1
+# Tool calls allowed to wait for a worker before new ones are rejected
+SERVER_MAX_QUEUED_REQUESTS = 64
+
+# Import graph (dependency-aware retrieval expansion)
+GRAPH_FILE_TYPES = [".ts", ".tsx"]
+# Non-relative import prefixes that resolve into the monorepo, as
+# (importing source prefix, import prefix, target directory) tuples
+IMPORT_ALIASES = [
+    ("", "@ballroomcompmanager/shared", "shared"),
+    ("", "@ballroom/shared", "shared"),
+    ("client/", "@", "client"),
+]
+
+# Indexing limits
+# Files larger than this are skipped (bytes)
+MAX_FILE_SIZE = 256 * 1024
+# Chunk text buffered across files before it is embedded and written
+# (bytes). Peak buffered text is bounded by this plus MAX_FILE_SIZE.
+INDEX_MEMORY_BUDGET = 1024 * 1024
+# Bytes read from the start of a file to detect generated/minified content
+GENERATED_SAMPLE_SIZE = 16 * 1024
+# Generated-file markers are only looked for near the top of the file
+GENERATED_HEADER_SIZE = 1024
+GENERATED_MARKERS = [
+    "@generated",
+    "auto-generated",
+    "autogenerated",
+    "code generated by",
+    "do not edit",
+]
+# Lines longer than this, or a sample averaging more than
+# MAX_AVG_LINE_LENGTH per line, are treated as minified
+MAX_LINE_LENGTH = 2000
+MAX_AVG_LINE_LENGTH = 200
+# Host header values the shared server accepts (port is ignored). Requests
+# with any other Host, or with an Origin header, are rejected so web pages
+# cannot reach the server through the browser or DNS rebinding.
+SERVER_ALLOWED_HOSTS = ["127.0.0.1", "localhost", "[::1]"]
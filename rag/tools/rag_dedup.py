@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import re
+
+from rag.tools.rag_config import (
+    DEDUP_BANDS,
+    DEDUP_NUM_PERM,
+    DEDUP_SHINGLE_SIZE,
+    DEDUP_THRESHOLD,
+)
+
+# -----------------------------
+# MINHASH
+# -----------------------------
+# Mersenne prime used for the universal hash family (a * x + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _hash64(data):
+    digest = hashlib.blake2b(data.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _permutations(num_perm):
+    # Deterministic coefficients so signatures stay comparable across runs
+    perms = []
+    for i in range(num_perm):
+        a = _hash64(f"minhash-a-{i}") % (_MERSENNE_PRIME - 1) + 1
+        b = _hash64(f"minhash-b-{i}") % _MERSENNE_PRIME
+        perms.append((a, b))
+    return perms
+
+
+_PERMS = _permutations(DEDUP_NUM_PERM)
+
+
+def normalize(text):
+    """Collapse whitespace so formatting-only differences hash identically."""
+    return " ".join(text.split())
+
+
+def content_hash(text):
+    return hashlib.sha1(normalize(text).encode("utf-8")).hexdigest()
+
+
+def shingles(text, size=DEDUP_SHINGLE_SIZE):
+    tokens = _TOKEN_RE.findall(text)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(text):
+    hashes = [_hash64(s) for s in shingles(text)]
+    if not hashes:
+        return [_MAX_HASH] * len(_PERMS)
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMS
+    ]
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    same = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+    return same / len(sig_a)
+
+
+# -----------------------------
+# PERSISTENT DEDUP INDEX
+# -----------------------------
+class DedupIndex:
+    """
+    Tracks canonical chunks by exact content hash and MinHash signature.
+    Near-duplicate candidates are found through LSH banding and confirmed
+    against DEDUP_THRESHOLD before being folded into the canonical chunk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.load()
+
+    def _file_mtime(self):
+        return os.path.getmtime(self.path) if os.path.exists(self.path) else None
+
+    def load(self):
+        """(Re)load persisted state, e.g. after another process re-indexed."""
+        self.canonical = {}
+        self._by_hash = {}
+        self._buckets = {}
+        self._loaded_mtime = self._file_mtime()
+        if self._loaded_mtime is not None:
+            with open(self.path, "r") as f:
+                self.canonical = json.load(f)
+        for chunk_id, entry in self.canonical.items():
+            self._register(chunk_id, entry)
+
+    def refresh(self):
+        """Reload if another process rewrote the index file since last load."""
+        if self._file_mtime() != self._loaded_mtime:
+            self.load()
+
+    def _bands(self, sig):
+        rows = len(sig) // DEDUP_BANDS
+        for band in range(DEDUP_BANDS):
+            yield (band, tuple(sig[band * rows : (band + 1) * rows]))
+
+    def _register(self, chunk_id, entry):
+        self._by_hash[entry["hash"]] = chunk_id
+        for key in self._bands(entry["sig"]):
+            self._buckets.setdefault(key, set()).add(chunk_id)
+
+    def _unregister(self, chunk_id, entry):
+        if self._by_hash.get(entry["hash"]) == chunk_id:
+            del self._by_hash[entry["hash"]]
+        for key in self._bands(entry["sig"]):
+            self._buckets.get(key, set()).discard(chunk_id)
+
+    def find(self, text):
+        """
+        Return (canonical_id, fingerprint) where canonical_id is the id of an
+        existing exact or near-duplicate chunk, or None if the text is new.
+        """
+        digest = content_hash(text)
+        sig = minhash(normalize(text))
+        fingerprint = {"hash": digest, "sig": sig}
+        if digest in self._by_hash:
+            return self._by_hash[digest], fingerprint
+
+        candidates = set()
+        for key in self._bands(sig):
+            candidates |= self._buckets.get(key, set())
+        best_id, best_score = None, 0.0
+        for chunk_id in candidates:
+            score = similarity(sig, self.canonical[chunk_id]["sig"])
+            if score > best_score:
+                best_id, best_score = chunk_id, score
+        if best_score >= DEDUP_THRESHOLD:
+            return best_id, fingerprint
+        return None, fingerprint
+
+    def add(self, chunk_id, source, fingerprint):
+        entry = self.canonical.get(chunk_id)
+        if entry is not None:
+            # Same id re-indexed: refresh the fingerprint, keep other files' aliases
+            self._unregister(chunk_id, entry)
+            entry.update(
+                hash=fingerprint["hash"], sig=fingerprint["sig"], source=source
+            )
+        else:
+            entry = {
+                "hash": fingerprint["hash"],
+                "sig": fingerprint["sig"],
+                "source": source,
+                "aliases": [],
+            }
+            self.canonical[chunk_id] = entry
+        self._register(chunk_id, entry)
+
+    def add_alias(self, chunk_id, alias):
+        aliases = self.canonical[chunk_id]["aliases"]
+        if alias not in aliases:
+            aliases.append(alias)
+
+    def forget_source(self, source):
+        """
+        Drop alias entries pointing at a source that is being re-indexed.
+        Returns the ids of canonical chunks whose alias list changed.
+        """
+        changed = []
+        prefix = f"{source}#"
+        for chunk_id, entry in self.canonical.items():
+            kept = [a for a in entry["aliases"] if not a.startswith(prefix)]
+            if len(kept) != len(entry["aliases"]):
+                entry["aliases"] = kept
+                changed.append(chunk_id)
+        return changed
+
+    def remove_source(self, source):
+        """
+        Forget every canonical chunk and alias belonging to a source.
+        Returns the other sources that were aliased to the removed chunks;
+        their content is no longer stored and they must be re-indexed.
+        """
+        self.forget_source(source)
+        orphaned = set()
+        for chunk_id, entry in list(self.canonical.items()):
+            if entry["source"] != source:
+                continue
+            self._unregister(chunk_id, entry)
+            del self.canonical[chunk_id]
+            orphaned.update(alias.rsplit("#", 1)[0] for alias in entry["aliases"])
+        orphaned.discard(source)
+        return sorted(orphaned)
+
+    def aliases(self, chunk_id):
+        return self.canonical[chunk_id]["aliases"]
+
+    def canonical_ids_for(self, sources):
+        """Ids of canonical chunks that stand in for chunks of the given sources."""
+        prefixes = tuple(f"{source}#" for source in sources)
+        return sorted(
+            chunk_id
+            for chunk_id, entry in self.canonical.items()
+            if any(alias.startswith(prefixes) for alias in entry["aliases"])
+        )
+
+    def clear(self):
+        self.canonical = {}
+        self._by_hash = {}
+        self._buckets = {}
+        self.save()
+
+    def save(self):
+        with open(self.path, "w") as f:
+            json.dump(self.canonical, f)
+        self._loaded_mtime = self._file_mtime()
@@ -0,0 +1,246 @@
+import json
+import os
+import re
+
+from rag.tools.rag_config import IMPORT_ALIASES, PROJECT_ROOT
+
+# -----------------------------
+# PARSING
+# -----------------------------
+# import/export ... from "x" (clause may span lines but never a statement end)
+FROM_IMPORT_RE = re.compile(
+    r"""\b(?:import|export)\s+(?:type\s+)?([^;'"]*?)\s*from\s*['"]([^'"]+)['"]"""
+)
+# import "x"; require("x"); import("x")
+BARE_IMPORT_RE = re.compile(
+    r"""(?:\bimport\s*\(?|\brequire\s*\()\s*['"]([^'"]+)['"]"""
+)
+DEFINITION_RE = re.compile(
+    r"^\s*(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:async\s+)?"
+    r"(?:function\*?|const|let|var|class|interface|type|enum)\s+([A-Za-z_$][\w$]*)"
+    # `type Foo,` inside an export list is a re-export, not a definition
+    r"(?![\w$]|\s*[,}])",
+    re.MULTILINE,
+)
+IDENTIFIER_RE = re.compile(r"[A-Za-z_$][\w$]*")
+# Start of a statement that may carry a module specifier
+STATEMENT_START_RE = re.compile(r"^\s*(?:import\b(?!\s*\()|export\s+(?:type\s+)?[*{])")
+STATEMENT_END_RE = re.compile(r"['\";]")
+MAX_STATEMENT_LINES = 100
+RESOLVE_SUFFIXES = ["", ".ts", ".tsx", "/index.ts", "/index.tsx"]
+
+
+def _clause_names(clause):
+    """Local names bound by an import clause like `A, { b as c, type D }`."""
+    names = []
+    clause = clause.strip()
+    if not clause or clause == "*":
+        return names
+    named = re.search(r"\{([^}]*)\}", clause)
+    if named:
+        for part in named.group(1).split(","):
+            part = re.sub(r"^\s*type\s+", "", part).strip()
+            if part:
+                names.append(part.split(" as ")[-1].strip())
+        clause = clause[: named.start()] + clause[named.end() :]
+    for part in clause.split(","):
+        part = part.strip()
+        if part.startswith("* as "):
+            names.append(part[5:].strip())
+        elif IDENTIFIER_RE.fullmatch(part):
+            names.append(part)
+    return names
+
+
+def parse_imports(content):
+    """Return {specifier: [imported local names]} for a TS/TSX source."""
+    imports = {}
+    for clause, specifier in FROM_IMPORT_RE.findall(content):
+        imports.setdefault(specifier, []).extend(_clause_names(clause))
+    for specifier in BARE_IMPORT_RE.findall(content):
+        imports.setdefault(specifier, [])
+    return imports
+
+
+def defined_symbols(text):
+    return sorted(set(DEFINITION_RE.findall(text)))
+
+
+def referenced_symbols(text, imported_names):
+    if not imported_names:
+        return []
+    tokens = set(IDENTIFIER_RE.findall(text))
+    return sorted(n for n in set(imported_names) if n in tokens)
+
+
+class ModuleScanner:
+    """
+    Collects import/export-from statements and notes whether a module
+    defines anything while its lines stream past, so building the graph
+    never needs the whole file in memory.
+    """
+
+    def __init__(self):
+        self._statements = []
+        self._current = []
+        self.barrel = True
+
+    def scan(self, lines):
+        """Pass lines through unchanged while recording what the graph needs."""
+        for line in lines:
+            self.feed(line)
+            yield line
+
+    def feed(self, line):
+        line = line.rstrip("\r\n")
+        if self._current or STATEMENT_START_RE.match(line):
+            self._current.append(line)
+            if (
+                STATEMENT_END_RE.search(line)
+                or len(self._current) >= MAX_STATEMENT_LINES
+            ):
+                self._statements.append("\n".join(self._current))
+                self._current = []
+        elif BARE_IMPORT_RE.search(line):
+            self._statements.append(line)
+        if self.barrel and DEFINITION_RE.search(line):
+            self.barrel = False
+
+    def text(self):
+        return "\n".join(self._statements + self._current)
+
+
+def resolve_import(source, specifier):
+    """
+    Map an import specifier to a project-relative module path, or None for
+    external packages and files that do not exist.
+    """
+    if specifier.startswith("."):
+        base = os.path.normpath(os.path.join(os.path.dirname(source), specifier))
+    else:
+        for source_prefix, alias, target in IMPORT_ALIASES:
+            if not source.startswith(source_prefix):
+                continue
+            if specifier == alias or specifier.startswith(alias + "/"):
+                base = target + specifier[len(alias) :]
+                break
+        else:
+            return None
+    # Imports of compiled output point back at the sources they mirror
+    bases = [base]
+    if "/dist/" in base + "/":
+        bases.append(base.replace("/dist", "", 1))
+    for candidate_base in bases:
+        for suffix in RESOLVE_SUFFIXES:
+            candidate = candidate_base + suffix
+            if os.path.isfile(os.path.join(PROJECT_ROOT, candidate)):
+                return candidate.replace(os.sep, "/")
+    return None
+
+
+# -----------------------------
+# PERSISTENT GRAPH
+# -----------------------------
+class ImportGraph:
+    """
+    Module-level import graph keyed by project-relative source path.
+    Each module records the in-project modules it imports; the reverse
+    (imported-by) edges are derived on load and save.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.load()
+
+    def _file_mtime(self):
+        return os.path.getmtime(self.path) if os.path.exists(self.path) else None
+
+    def load(self):
+        self.modules = {}
+        self._loaded_mtime = self._file_mtime()
+        if self._loaded_mtime is not None:
+            with open(self.path, "r") as f:
+                self.modules = json.load(f)
+        self._saved_sources = set(self.modules)
+        self._rebuild_reverse()
+
+    def refresh(self):
+        """Reload if another process rewrote the graph file since last load."""
+        if self._file_mtime() != self._loaded_mtime:
+            self.load()
+
+    def _rebuild_reverse(self):
+        self._imported_by = {}
+        for source, entry in self.modules.items():
+            for target in entry["imports"]:
+                self._imported_by.setdefault(target, set()).add(source)
+
+    def update_module(self, source, content, barrel=None):
+        """
+        Parse a module's imports and return the local names it imports.
+        content may be the full source or ModuleScanner.text(); in the
+        latter case pass the scanner's barrel flag.
+        """
+        imports = []
+        names = []
+        parsed = parse_imports(content)
+        for specifier, imported in parsed.items():
+            target = resolve_import(source, specifier)
+            if target and target != source:
+                imports.append(target)
+                names.extend(imported)
+        self.modules[source] = {
+            "imports": sorted(set(imports)),
+            # Kept so imports can be re-resolved when modules come and go
+            "specifiers": sorted(parsed),
+            # Index files that only re-export are looked through, not returned
+            "barrel": not defined_symbols(content) if barrel is None else barrel,
+        }
+        return names
+
+    def neighbours(self, source):
+        """Modules imported by or importing the given module."""
+        result = set()
+        for module in self.modules.get(source, {}).get("imports", []):
+            if self._is_barrel(module):
+                result.update(self.modules[module]["imports"])
+            else:
+                result.add(module)
+        for module in self._imported_by.get(source, set()):
+            if self._is_barrel(module):
+                result.update(self._imported_by.get(module, set()))
+            else:
+                result.add(module)
+        result.discard(source)
+        return sorted(result)
+
+    def _is_barrel(self, module):
+        return self.modules.get(module, {}).get("barrel", False)
+
+    def prune(self, sources):
+        """
+        Drop modules that were not seen in the latest indexing run and the
+        import edges pointing at them. When modules were added or removed,
+        unchanged modules' imports are re-resolved so imports of new files
+        connect too.
+        """
+        self.modules = {s: e for s, e in self.modules.items() if s in sources}
+        reresolve = set(self.modules) != self._saved_sources
+        for source, entry in self.modules.items():
+            imports = entry["imports"]
+            # Entries written before specifiers were stored keep their edges
+            if reresolve and "specifiers" in entry:
+                imports = {
+                    resolve_import(source, specifier)
+                    for specifier in entry["specifiers"]
+                }
+            entry["imports"] = sorted(
+                t for t in imports if t in self.modules and t != source
+            )
+
+    def save(self):
+        self._rebuild_reverse()
+        with open(self.path, "w") as f:
+            json.dump(self.modules, f)
+        self._saved_sources = set(self.modules)
+        self._loaded_mtime = self._file_mtime()
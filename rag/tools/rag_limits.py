@@ -0,0 +1,45 @@
+import os
+
+from rag.tools.rag_config import (
+    GENERATED_HEADER_SIZE,
+    GENERATED_MARKERS,
+    GENERATED_SAMPLE_SIZE,
+    MAX_AVG_LINE_LENGTH,
+    MAX_FILE_SIZE,
+    MAX_LINE_LENGTH,
+)
+
+# -----------------------------
+# INDEXING LIMITS
+# -----------------------------
+def detect_generated(path):
+    """Return a skip reason if the file looks generated or minified."""
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        sample = file.read(GENERATED_SAMPLE_SIZE)
+    header = sample[:GENERATED_HEADER_SIZE].lower()
+    for marker in GENERATED_MARKERS:
+        if marker in header:
+            return f"generated file marker '{marker}'"
+    lines = sample.splitlines()
+    if not lines:
+        return None
+    longest = max(len(line) for line in lines)
+    if longest > MAX_LINE_LENGTH:
+        return f"minified content (line of {longest} chars)"
+    average = sum(len(line) for line in lines) / len(lines)
+    if average > MAX_AVG_LINE_LENGTH:
+        return f"minified content (average line of {int(average)} chars)"
+    return None
+
+
+def check_file_size(path):
+    """Return a skip reason if the file exceeds MAX_FILE_SIZE, else None."""
+    size = os.path.getsize(path)
+    if size > MAX_FILE_SIZE:
+        return f"size {size} bytes exceeds MAX_FILE_SIZE ({MAX_FILE_SIZE})"
+    return None
+
+
+def check_file_limits(path):
+    """Return a skip reason if the file should not be indexed, else None."""
+    return check_file_size(path) or detect_generated(path)
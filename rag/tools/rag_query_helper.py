@@ -1,18 +1,86 @@
 # rag_query_helper.py
+import json
+import os
 import sys
+import urllib.error
+import urllib.request
 
-from rag_service import build_prompt
+# Set to the shared server (e.g. http://127.0.0.1:8765) started with
+# `run_mcp_server.py --transport sse` to avoid loading the model per call.
+RAG_SERVER_URL = os.environ.get("RAG_SERVER_URL")
+
+
+def fetch_prompt(server_url, user_request, top_k=5, type_filter=None, expand=0):
+    payload = json.dumps(
+        {
+            "query": user_request,
+            "top_k": top_k,
+            "type_filter": type_filter,
+            "expand": expand,
+        }
+    ).encode("utf-8")
+    request = urllib.request.Request(
+        server_url.rstrip("/") + "/prompt",
+        data=payload,
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            result = json.load(response)
+    except urllib.error.HTTPError as e:
+        # The server is up but refused or failed the request (e.g. 503 busy)
+        try:
+            body = json.load(e)
+        except ValueError:
+            body = None
+        error = body.get("error", e.reason) if isinstance(body, dict) else e.reason
+        raise RuntimeError(f"HTTP {e.code}: {error}") from e
+    except TimeoutError as e:
+        raise RuntimeError("timed out waiting for the server") from e
+    except ValueError as e:
+        raise RuntimeError(f"invalid JSON response: {e}") from e
+    if not isinstance(result, dict):
+        raise RuntimeError("invalid JSON response: expected an object")
+    if not result.get("ok"):
+        raise RuntimeError(result.get("error", "Unknown error"))
+    return result["prompt"]
 
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python rag_query_helper.py '<user request>' [type_filter]")
+        print(
+            "Usage: python rag_query_helper.py '<user request>' [type_filter] [expand]"
+        )
         sys.exit(1)
 
     user_request = sys.argv[1]
-    type_filter = sys.argv[2] if len(sys.argv) > 2 else None
+    type_filter = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] else None
+    expand = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    if RAG_SERVER_URL:
+        try:
+            print(
+                fetch_prompt(RAG_SERVER_URL, user_request, 5, type_filter, expand)
+            )
+            return
+        except RuntimeError as e:
+            # Don't fall back: a second local process is what the server avoids
+            print(f"RAG server at {RAG_SERVER_URL} error: {e}", file=sys.stderr)
+            sys.exit(1)
+        except urllib.error.URLError as e:
+            print(
+                f"RAG server at {RAG_SERVER_URL} unreachable ({e.reason}), "
+                "falling back to local index",
+                file=sys.stderr,
+            )
+
+    # Imported lazily: loads the embedding model and opens the Chroma DB
+    from rag_service import build_prompt
 
-    prompt = build_prompt(user_request, top_k=5, type_filter=type_filter)
+    prompt = build_prompt(
+        user_request, top_k=5, type_filter=type_filter, expand=expand
+    )
     print(prompt)
 
 
@@ -1,26 +1,60 @@
 import json
 import os
+import sys
 
 import chromadb
 from sentence_transformers import SentenceTransformer
 
 from rag.tools.rag_config import (
     DB_FOLDER,
+    DEDUP_ENABLED,
     DIR_TYPE_MAP,
     FILE_TYPES,
+    GRAPH_FILE_TYPES,
+    INDEX_MEMORY_BUDGET,
     MAX_CHUNK_SIZE,
     PROJECT_ROOT,
     RAG_DIRS,
 )
+from rag.tools.rag_dedup import DedupIndex
+from rag.tools.rag_graph import (
+    ImportGraph,
+    ModuleScanner,
+    defined_symbols,
+    referenced_symbols,
+)
+from rag.tools.rag_limits import check_file_limits, check_file_size
 
 # -----------------------------
 # PERSISTENT METADATA
 # -----------------------------
 META_FILE = os.path.join(PROJECT_ROOT, "rag/tools/chroma_indexed.json")
-if os.path.exists(META_FILE):
-    indexed_files = json.load(open(META_FILE, "r"))
-else:
-    indexed_files = {}
+indexed_files = {}
+
+# Canonical chunk fingerprints for near-duplicate detection
+DEDUP_FILE = os.path.join(PROJECT_ROOT, "rag/tools/chroma_dedup.json")
+dedup_index = DedupIndex(DEDUP_FILE)
+
+# Module import graph for dependency-aware query expansion
+GRAPH_FILE = os.path.join(PROJECT_ROOT, "rag/tools/import_graph.json")
+import_graph = ImportGraph(GRAPH_FILE)
+
+
+def load_index_state():
+    """
+    Re-read persisted index state. A long-running server calls this before
+    each ingest so runs by other processes (e.g. the git hook) are not
+    overwritten with stale in-memory state.
+    """
+    indexed_files.clear()
+    if os.path.exists(META_FILE):
+        with open(META_FILE, "r") as f:
+            indexed_files.update(json.load(f))
+    dedup_index.load()
+    import_graph.load()
+
+
+load_index_state()
 
 # -----------------------------
 # EMBEDDING MODEL
@@ -73,99 +107,374 @@ def should_skip_chunk(chunk):
 # FILE READING & CHUNKING
 # -----------------------------
 def read_files(base_dirs, file_types):
-    files_content = []
+    """Yield matching file paths; contents are streamed by the caller."""
     for base_dir in base_dirs:
         for root, _, files in os.walk(base_dir):
             for f in files:
                 if any(f.endswith(ext) for ext in file_types):
-                    path = os.path.join(root, f)
-                    with open(path, "r", encoding="utf-8") as file:
-                        content = file.read()
-                    files_content.append((path, content))
-    return files_content
+                    yield os.path.join(root, f)
 
 
-def chunk_text(text, max_size=MAX_CHUNK_SIZE):
-    lines = text.splitlines()
-    chunks = []
+def chunk_lines(lines, max_size=MAX_CHUNK_SIZE):
+    """Group an iterable of lines (e.g. an open file) into chunks lazily."""
     current_chunk = []
     current_len = 0
     for line in lines:
+        line = line.rstrip("\r\n")
         current_len += len(line)
         current_chunk.append(line)
         if current_len >= max_size:
-            chunks.append("\n".join(current_chunk))
+            yield "\n".join(current_chunk)
             current_chunk = []
             current_len = 0
     if current_chunk:
-        chunks.append("\n".join(current_chunk))
-    return chunks
+        yield "\n".join(current_chunk)
+
+
+def chunk_text(text, max_size=MAX_CHUNK_SIZE):
+    return list(chunk_lines(text.splitlines(), max_size))
 
 
 # -----------------------------
 # INDEXING FUNCTION
 # -----------------------------
-def index_project():
-    files = read_files(RAG_DIRS, FILE_TYPES)
-    total_chunks = 0
-    for path, content in files:
-        if should_skip_file(path):
-            continue
-        mtime = os.path.getmtime(path)
-        if path in indexed_files and indexed_files[path] == mtime:
-            continue  # skip unchanged
-        chunks = [c for c in chunk_text(content) if not should_skip_chunk(c)]
-        if not chunks:
-            continue
-        embeddings = embed_texts(chunks)
-        chunk_type = "unknown"
-        for dir_key, type_name in DIR_TYPE_MAP.items():
-            folder_path = os.path.join(PROJECT_ROOT, dir_key)
-            if path.startswith(folder_path):
-                chunk_type = type_name
-                break
-        for i, chunk in enumerate(chunks):
+def _alias_metadata(chunk_id):
+    entry = dedup_index.canonical.get(chunk_id, {})
+    return {"aliases": ", ".join(entry.get("aliases", []))}
+
+
+def _symbol_metadata(chunk, imported_names):
+    return {
+        "defines": ", ".join(defined_symbols(chunk)),
+        "references": ", ".join(referenced_symbols(chunk, imported_names)),
+    }
+
+
+def _split_symbols(value):
+    return {s for s in value.split(", ") if s} if value else set()
+
+
+def _flush(run):
+    """
+    Embed and store the buffered chunks, refresh alias lists on chunks
+    stored earlier, then mark the files behind this batch as indexed.
+    """
+    pending = run["pending"]
+    if pending:
+        embeddings = embed_texts([chunk for _, chunk, _ in pending])
+        for (chunk_id, chunk, metadata), embedding in zip(pending, embeddings):
             collection.add(
                 documents=[chunk],
-                metadatas=[
-                    {
-                        "source": os.path.relpath(path, PROJECT_ROOT),
-                        "chunk_index": i,
-                        "type": chunk_type,
-                    }
-                ],
-                ids=[f"{path}-{i}"],
-                embeddings=[embeddings[i]],
+                metadatas=[{**metadata, **_alias_metadata(chunk_id)}],
+                ids=[chunk_id],
+                embeddings=[embedding],
             )
-        indexed_files[path] = mtime
-        total_chunks += len(chunks)
+        run["chunks_added"] += len(pending)
+    for chunk_id in run["touched"]:
+        if chunk_id in dedup_index.canonical:
+            collection.update(ids=[chunk_id], metadatas=[_alias_metadata(chunk_id)])
+    indexed_files.update(run["completed"])
+    run["pending"] = []
+    run["pending_bytes"] = 0
+    run["touched"] = set()
+    run["completed"] = {}
+
+
+def _remove_source(source, run):
+    """
+    Delete a file's stored and buffered chunks and its dedup entries. Files
+    whose chunks were folded into them are queued for re-indexing so their
+    content survives.
+    """
+    collection.delete(where={"source": source})
+    kept = [p for p in run["pending"] if p[2]["source"] != source]
+    if len(kept) != len(run["pending"]):
+        run["pending"] = kept
+        run["pending_bytes"] = sum(len(chunk) for _, chunk, _ in kept)
+    if not DEDUP_ENABLED:
+        return
+    for orphan in dedup_index.remove_source(source):
+        orphan_path = os.path.normpath(os.path.join(PROJECT_ROOT, orphan))
+        indexed_files.pop(orphan_path, None)
+        run["completed"].pop(orphan_path, None)
+        run["requeue"].append(orphan_path)
+
+
+def _drop_source(path, source, run):
+    """Remove chunks of a previously indexed file that is now skipped."""
+    if path not in indexed_files:
+        return
+    _remove_source(source, run)
+    del indexed_files[path]
+
+
+def _scan_module(path, source):
+    scanner = ModuleScanner()
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            scanner.feed(line)
+    import_graph.update_module(source, scanner.text(), barrel=scanner.barrel)
+
+
+def _index_file(path, run):
+    if should_skip_file(path):
+        return
+    source = os.path.relpath(path, PROJECT_ROOT)
+    mtime = os.path.getmtime(path)
+    unchanged = path in indexed_files and indexed_files[path] == mtime
+    # Unchanged files passed the generated/minified check when they were
+    # indexed; only new and changed files have their content sampled
+    reason = check_file_size(path) if unchanged else check_file_limits(path)
+    if reason:
+        run["skipped"].append({"source": source, "reason": reason})
+        _drop_source(path, source, run)
+        return
+    is_module = path.endswith(tuple(GRAPH_FILE_TYPES))
+    if is_module:
+        run["graph_sources"].add(source)
+    if unchanged:
+        # Unchanged modules keep their graph entry unless it is missing
+        if is_module and source not in import_graph.modules:
+            _scan_module(path, source)
+        return
+
+    chunk_type = "unknown"
+    for dir_key, type_name in DIR_TYPE_MAP.items():
+        folder_path = os.path.join(PROJECT_ROOT, dir_key)
+        if path.startswith(folder_path):
+            chunk_type = type_name
+            break
+
+    # Replace the previous version of this file: its old chunks, its
+    # canonical entries and the aliases it contributed to other chunks
+    if DEDUP_ENABLED:
+        run["touched"] |= set(dedup_index.forget_source(source))
+    _remove_source(source, run)
+    scanner = ModuleScanner() if is_module else None
+    file_chunks = []
+    folded = 0
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            lines = scanner.scan(file) if scanner else file
+            chunks = (c for c in chunk_lines(lines) if not should_skip_chunk(c))
+            for i, chunk in enumerate(chunks):
+                chunk_id = f"{path}-{i}"
+                if DEDUP_ENABLED:
+                    canonical_id, fingerprint = dedup_index.find(chunk)
+                    if canonical_id is not None and canonical_id != chunk_id:
+                        dedup_index.add_alias(canonical_id, f"{source}#{i}")
+                        run["touched"].add(canonical_id)
+                        folded += 1
+                        continue
+                    dedup_index.add(chunk_id, source, fingerprint)
+                file_chunks.append((i, chunk_id, chunk))
+    except UnicodeDecodeError:
+        # Undo the dedup entries and aliases recorded before the bad byte
+        run["skipped"].append({"source": source, "reason": "not valid UTF-8"})
+        _remove_source(source, run)
+        indexed_files.pop(path, None)
+        run["graph_sources"].discard(source)
+        return
+    run["duplicates_folded"] += folded
+
+    imported_names = []
+    if scanner:
+        imported_names = import_graph.update_module(
+            source, scanner.text(), barrel=scanner.barrel
+        )
+    for i, chunk_id, chunk in file_chunks:
+        metadata = {
+            "source": source,
+            "chunk_index": i,
+            "type": chunk_type,
+            **_symbol_metadata(chunk, imported_names),
+        }
+        run["pending"].append((chunk_id, chunk, metadata))
+        run["pending_bytes"] += len(chunk)
+    run["completed"][path] = mtime
+    # Batches span files; flushing only between files keeps peak buffered
+    # text under INDEX_MEMORY_BUDGET + MAX_FILE_SIZE
+    if run["pending_bytes"] >= INDEX_MEMORY_BUDGET:
+        _flush(run)
+
+
+def clear_index():
+    """
+    Remove every stored chunk and forget what was indexed, so the next
+    index_project() run re-reads all files from scratch.
+    """
+    ids = collection.get().get("ids", [])
+    if ids:
+        collection.delete(ids=ids)
+    dedup_index.clear()
+    indexed_files.clear()
+    # index_project() reloads state from disk, so persist the emptied state
+    with open(META_FILE, "w") as f:
+        json.dump(indexed_files, f)
+
+
+def index_project():
+    """
+    Incrementally index RAG_DIRS and return an ingest summary with the
+    number of chunks added, duplicates folded and files skipped (with reason).
+    """
+    load_index_state()
+    run = {
+        "chunks_added": 0,
+        "duplicates_folded": 0,
+        "skipped": [],
+        "graph_sources": set(),
+        "requeue": [],
+        "pending": [],
+        "pending_bytes": 0,
+        "touched": set(),
+        "completed": {},
+    }
+    for path in read_files(RAG_DIRS, FILE_TYPES):
+        _index_file(path, run)
+    # Files whose duplicates lost their canonical chunk during this run
+    while run["requeue"]:
+        path = run["requeue"].pop(0)
+        if path in indexed_files or path in run["completed"]:
+            continue
+        source = os.path.relpath(path, PROJECT_ROOT)
+        if any(skip["source"] == source for skip in run["skipped"]):
+            continue
+        if os.path.isfile(path):
+            _index_file(path, run)
+    _flush(run)
     # Save metadata
     with open(META_FILE, "w") as f:
         json.dump(indexed_files, f)
-    print(f"Indexing complete. Added {total_chunks} chunks.")
+    if DEDUP_ENABLED:
+        dedup_index.save()
+    import_graph.prune(run["graph_sources"])
+    import_graph.save()
+
+    skipped = run["skipped"]
+    print(
+        f"Indexing complete. Added {run['chunks_added']} chunks, "
+        f"folded {run['duplicates_folded']} duplicates into existing chunks, "
+        f"skipped {len(skipped)} files."
+    )
+    for skip in skipped:
+        print(f"  skipped {skip['source']}: {skip['reason']}")
+    return {
+        "chunks_added": run["chunks_added"],
+        "duplicates_folded": run["duplicates_folded"],
+        "skipped": skipped,
+    }
 
 
 # -----------------------------
 # QUERY FUNCTION
 # -----------------------------
-def query_rag(query_text, top_k=5, type_filter=None):
+def _distance(a, b):
+    """Squared L2 distance, Chroma's default collection metric."""
+    return sum((x - y) ** 2 for x, y in zip(a, b))
+
+
+def expand_results(query_embedding, hit_ids, hit_metadatas, limit):
+    """
+    Pull related chunks, as (document, metadata) pairs, from modules that the
+    hits import or are imported by. Chunks defining symbols the hits reference come first; remaining slots
+    are filled by similarity to the query within those modules.
+    """
+    import_graph.refresh()
+    neighbours = []
+    references = set()
+    for meta in hit_metadatas:
+        for module in import_graph.neighbours(meta.get("source", "")):
+            if module not in neighbours:
+                neighbours.append(module)
+        references |= _split_symbols(meta.get("references"))
+    if not neighbours or limit <= 0:
+        return []
+
+    include = ["documents", "metadatas", "embeddings"]
+    candidates = collection.get(where={"source": {"$in": neighbours}}, include=include)
+    ids = list(candidates["ids"])
+    docs = list(candidates["documents"])
+    metadatas = list(candidates["metadatas"])
+    embeddings = list(candidates["embeddings"])
+    # Neighbour chunks folded into a canonical copy stored under another file
+    if DEDUP_ENABLED:
+        dedup_index.refresh()
+        known = set(ids)
+        folded = [
+            chunk_id
+            for chunk_id in dedup_index.canonical_ids_for(neighbours)
+            if chunk_id not in known
+        ]
+        if folded:
+            extra = collection.get(ids=folded, include=include)
+            ids += extra["ids"]
+            docs += extra["documents"]
+            metadatas += extra["metadatas"]
+            embeddings += list(extra["embeddings"])
+
+    seen = set(hit_ids)
+    scored = []
+    for chunk_id, doc, meta in zip(ids, docs, metadatas):
+        overlap = len(references & _split_symbols(meta.get("defines")))
+        if overlap and chunk_id not in seen:
+            scored.append((overlap, chunk_id, doc, meta))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    related = []
+    for _, chunk_id, doc, meta in scored[:limit]:
+        related.append((doc, meta))
+        seen.add(chunk_id)
+
+    if len(related) < limit:
+        ranked = sorted(
+            (
+                (_distance(query_embedding, embedding), chunk_id, doc, meta)
+                for chunk_id, doc, meta, embedding in zip(
+                    ids, docs, metadatas, embeddings
+                )
+                if chunk_id not in seen
+            ),
+            key=lambda item: item[0],
+        )
+        for _, _, doc, meta in ranked[: limit - len(related)]:
+            related.append((doc, meta))
+    return related
+
+
+def query_chunks(query_text, top_k=5, type_filter=None, expand=0):
+    """Like query_rag(), but return (document, metadata) pairs."""
     query_embedding = embed_texts([query_text])[0]
     results = collection.query(query_embeddings=[query_embedding], n_results=top_k)
     docs = results["documents"][0] if results["documents"] else []
+    ids = results["ids"][0] if results["ids"] else []
+    metadatas = results["metadatas"][0] if results["metadatas"] else []
     if type_filter:
-        metadatas = results["metadatas"][0]
-        filtered_docs = [
-            doc for doc, meta in zip(docs, metadatas) if meta.get("type") == type_filter
+        kept = [
+            (i, doc, meta)
+            for i, doc, meta in zip(ids, docs, metadatas)
+            if meta.get("type") == type_filter
         ]
-        return filtered_docs
-    return docs
+        ids = [i for i, _, _ in kept]
+        docs = [doc for _, doc, _ in kept]
+        metadatas = [meta for _, _, meta in kept]
+    chunks = list(zip(docs, metadatas))
+    if expand:
+        chunks += expand_results(query_embedding, ids, metadatas, expand)
+    return chunks
+
+
+def query_rag(query_text, top_k=5, type_filter=None, expand=0):
+    chunks = query_chunks(query_text, top_k, type_filter, expand)
+    return [doc for doc, _ in chunks]
 
 
 # -----------------------------
 # PROMPT HELPER FOR LLM
 # -----------------------------
-def build_prompt(user_request, top_k=5, type_filter=None):
-    chunks = query_rag(user_request, top_k=top_k, type_filter=type_filter)
+def build_prompt(user_request, top_k=5, type_filter=None, expand=0):
+    chunks = query_rag(
+        user_request, top_k=top_k, type_filter=type_filter, expand=expand
+    )
     if not chunks:
         return f"No project context found for request: {user_request}\n\n"
     context_text = "\n\n".join(chunks)
@@ -184,6 +493,8 @@ User request:
 # -----------------------------
 if __name__ == "__main__":
     index_project()
+    if "--non-interactive" in sys.argv:
+        sys.exit(0)
     while True:
         query = input("\nEnter query (or 'exit'): ")
         if query.lower() == "exit":
@@ -0,0 +1,84 @@
+from rag.tools.rag_dedup import DedupIndex, minhash, similarity
+
+BASE = "\n".join(
+    f"export const field{i} = z.string().min(1).describe('field number {i}');"
+    for i in range(20)
+)
+
+
+def _index(tmp_path):
+    return DedupIndex(str(tmp_path / "dedup.json"))
+
+
+def _add(index, chunk_id, source, text):
+    found, fingerprint = index.find(text)
+    assert found is None
+    index.add(chunk_id, source, fingerprint)
+
+
+def test_exact_match_ignores_whitespace(tmp_path):
+    index = _index(tmp_path)
+    _add(index, "a-0", "a.ts", BASE)
+    found, _ = index.find(BASE.replace("\n", "\n\n  "))
+    assert found == "a-0"
+
+
+def test_near_match_and_unrelated_text(tmp_path):
+    index = _index(tmp_path)
+    _add(index, "a-0", "a.ts", BASE)
+    near = BASE.replace("field number 7", "field number seven")
+    assert similarity(minhash(BASE), minhash(near)) >= 0.85
+    assert index.find(near)[0] == "a-0"
+    assert index.find("import { router } from '../base';\nexport {}")[0] is None
+
+
+def test_reindexing_canonical_keeps_aliases(tmp_path):
+    index = _index(tmp_path)
+    _add(index, "a-0", "a.ts", BASE)
+    index.add_alias("a-0", "b.ts#0")
+
+    changed = "type Totally = 'different';\nconst other = 42;"
+    _, fingerprint = index.find(changed)
+    index.add("a-0", "a.ts", fingerprint)
+
+    assert index.aliases("a-0") == ["b.ts#0"]
+    # The old text no longer resolves to a chunk that now holds new content
+    assert index.find(BASE)[0] is None
+    assert index.find(changed)[0] == "a-0"
+
+
+def test_remove_source_returns_orphaned_aliases(tmp_path):
+    index = _index(tmp_path)
+    _add(index, "a-0", "a.ts", BASE)
+    index.add_alias("a-0", "b.ts#0")
+    index.add_alias("a-0", "a.ts#3")
+    _add(index, "c-0", "c.ts", "const c = 1;\nconst d = 2;")
+    index.add_alias("c-0", "a.ts#1")
+
+    assert index.remove_source("a.ts") == ["b.ts"]
+    assert "a-0" not in index.canonical
+    assert index.aliases("c-0") == []
+    assert index.find(BASE)[0] is None
+
+
+def test_state_survives_save_and_load(tmp_path):
+    index = _index(tmp_path)
+    _add(index, "a-0", "a.ts", BASE)
+    index.add_alias("a-0", "b.ts#0")
+    index.save()
+
+    reloaded = _index(tmp_path)
+    assert reloaded.find(BASE)[0] == "a-0"
+    assert reloaded.aliases("a-0") == ["b.ts#0"]
+
+
+def test_canonical_ids_for_folded_sources(tmp_path):
+    index = _index(tmp_path)
+    _add(index, "a-0", "a.ts", BASE)
+    _add(index, "c-0", "c.ts", "const c = 1;\nconst d = 2;")
+    index.add_alias("a-0", "b.ts#0")
+    index.add_alias("c-0", "b.tsx#2")
+
+    assert index.canonical_ids_for(["b.ts"]) == ["a-0"]
+    assert index.canonical_ids_for(["b.ts", "b.tsx"]) == ["a-0", "c-0"]
+    assert index.canonical_ids_for(["a.ts"]) == []
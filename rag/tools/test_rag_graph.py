@@ -0,0 +1,133 @@
+from rag.tools import rag_graph
+from rag.tools.rag_graph import (
+    ImportGraph,
+    ModuleScanner,
+    _clause_names,
+    defined_symbols,
+    parse_imports,
+    resolve_import,
+)
+
+MODULE = """\
+import {
+  getEvent,
+  type EventRow,
+  toDto as mapEvent,
+} from "./dal/event";
+import Default, * as schemas from '../shared/schemas';
+import type { Role } from "./roles";
+export * from './barrel';
+import "./polyfill";
+const legacy = require("./legacy");
+
+export const handler = () => getEvent(mapEvent(Default));
+"""
+
+
+def _write(root, path, text=""):
+    file = root / path
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(text)
+
+
+def test_clause_names_handles_type_and_as():
+    assert _clause_names("A, { b as c, type D }") == ["c", "D", "A"]
+    assert _clause_names("* as ns") == ["ns"]
+    assert _clause_names("*") == []
+
+
+def test_parse_imports_multiline_clauses():
+    assert parse_imports(MODULE) == {
+        "./dal/event": ["getEvent", "EventRow", "mapEvent"],
+        "../shared/schemas": ["Default", "schemas"],
+        "./roles": ["Role"],
+        "./barrel": [],
+        "./polyfill": [],
+        "./legacy": [],
+    }
+
+
+def test_definitions_skip_type_reexports():
+    text = (
+        "export type Category = 'a' | 'b';\n"
+        "export default class Widget {}\n"
+        "export async function load() {}\n"
+        "export {\n  type EventCategory,\n  type Other }\n"
+    )
+    assert defined_symbols(text) == ["Category", "Widget", "load"]
+
+
+def test_scanner_matches_whole_file_parse():
+    scanner = ModuleScanner()
+    lines = MODULE.splitlines(keepends=True)
+    assert list(scanner.scan(lines)) == lines
+    assert parse_imports(scanner.text()) == parse_imports(MODULE)
+    assert scanner.barrel is False
+
+
+def test_scanner_detects_barrel():
+    scanner = ModuleScanner()
+    for line in [
+        "export * from './eventMapper';\n",
+        "export {\n",
+        "  type EventCategory,\n",
+        "  venueMapper,\n",
+        "} from './venueMapper';\n",
+    ]:
+        scanner.feed(line)
+    assert scanner.barrel is True
+    assert sorted(parse_imports(scanner.text())) == ["./eventMapper", "./venueMapper"]
+
+
+def test_resolve_import_aliases(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_graph, "PROJECT_ROOT", str(tmp_path))
+    _write(tmp_path, "shared/index.ts")
+    _write(tmp_path, "shared/data/enums/eventTypes.ts")
+    _write(tmp_path, "client/src/lib/api.ts")
+    _write(tmp_path, "server/src/dal/event.tsx")
+
+    assert resolve_import("server/src/trpc/x.ts", "../dal/event") == (
+        "server/src/dal/event.tsx"
+    )
+    assert resolve_import("client/src/App.tsx", "@ballroomcompmanager/shared") == (
+        "shared/index.ts"
+    )
+    # Compiled output points back at the source it mirrors
+    dist = "@ballroomcompmanager/shared/dist/data/enums/eventTypes"
+    assert resolve_import("server/src/mappers/m.ts", dist) == (
+        "shared/data/enums/eventTypes.ts"
+    )
+    assert resolve_import("client/src/App.tsx", "@/src/lib/api") == (
+        "client/src/lib/api.ts"
+    )
+    # The client alias only applies to client sources
+    assert resolve_import("server/src/x.ts", "@/src/lib/api") is None
+    assert resolve_import("client/src/App.tsx", "react") is None
+
+
+def test_graph_looks_through_barrels_and_reresolves(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_graph, "PROJECT_ROOT", str(tmp_path))
+    _write(tmp_path, "mappers/index.ts", "export * from './event';\n")
+    _write(tmp_path, "mappers/event.ts", "export const toDto = 1;\n")
+    graph = ImportGraph(str(tmp_path / "graph.json"))
+    graph.update_module("mappers/index.ts", "export * from './event';\n")
+    graph.update_module("mappers/event.ts", "export const toDto = 1;\n")
+    graph.update_module(
+        "router.ts", "import { toDto } from './mappers';\nimport './late';\n"
+    )
+    graph.prune({"mappers/index.ts", "mappers/event.ts", "router.ts"})
+    graph.save()
+    assert graph.neighbours("router.ts") == ["mappers/event.ts"]
+    assert graph.neighbours("mappers/event.ts") == ["router.ts"]
+
+    # A module added later connects without re-scanning router.ts
+    _write(tmp_path, "late.ts", "export const late = 1;\n")
+    graph.update_module("late.ts", "export const late = 1;\n")
+    graph.prune({"mappers/index.ts", "mappers/event.ts", "router.ts", "late.ts"})
+    graph.save()
+    assert "late.ts" in graph.modules["router.ts"]["imports"]
+
+    # Edges to deleted modules are dropped
+    graph.prune({"mappers/index.ts", "router.ts", "late.ts"})
+    graph.save()
+    assert graph.neighbours("router.ts") == ["late.ts"]
@@ -0,0 +1,46 @@
+from rag.tools import rag_limits
+from rag.tools.rag_limits import check_file_limits, detect_generated
+
+CODE = "\n".join(f"export const value{i} = compute({i});" for i in range(50))
+
+
+def _file(tmp_path, text, name="module.ts"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_regular_source_is_indexed(tmp_path):
+    assert check_file_limits(_file(tmp_path, CODE)) is None
+    assert detect_generated(_file(tmp_path, "", "empty.ts")) is None
+
+
+def test_generated_marker_in_header(tmp_path):
+    path = _file(tmp_path, "// This file is @generated by codegen\n" + CODE)
+    assert detect_generated(path) == "generated file marker '@generated'"
+    path = _file(tmp_path, "/**\n * AUTO-GENERATED, Do Not Edit\n */\n" + CODE)
+    assert detect_generated(path) == "generated file marker 'auto-generated'"
+
+
+def test_marker_outside_header_is_ignored(tmp_path):
+    text = CODE + "\n" * 40 + "// do not edit the value below\n"
+    assert len(text) > rag_limits.GENERATED_HEADER_SIZE
+    assert detect_generated(_file(tmp_path, text)) is None
+
+
+def test_single_long_line_is_minified(tmp_path):
+    path = _file(tmp_path, CODE + "\n" + "a=1;" * 600)
+    assert detect_generated(path) == "minified content (line of 2400 chars)"
+
+
+def test_long_average_line_is_minified(tmp_path):
+    path = _file(tmp_path, "\n".join("x" * 300 for _ in range(10)))
+    assert detect_generated(path) == "minified content (average line of 300 chars)"
+
+
+def test_file_size_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_limits, "MAX_FILE_SIZE", 100)
+    path = _file(tmp_path, CODE)
+    assert check_file_limits(path) == (
+        f"size {len(CODE)} bytes exceeds MAX_FILE_SIZE (100)"
+    )